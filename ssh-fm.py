@@ -9,6 +9,15 @@ import sys
 import re
 import subprocess
 import json
+import itertools
+import mimetypes
+import atexit
+import shlex
+import shutil
+import tempfile
+import asyncio
+import time
+import threading
 from pathlib import Path
 
 class Colors:
@@ -21,10 +30,150 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+HOME = str(Path.home())
+
+HEADER_BAR = f"\n{Colors.HEADER}{'='*60}\n🔑 SSH CONNECTION MANAGER\n{'='*60}{Colors.ENDC}\n\n"
+
+# Prebuilt color fragments, so redraws don't re-format the same escapes
+MENU_NUMBERS = tuple(f"{Colors.BLUE}{i}.{Colors.ENDC}" for i in range(10))
+OK_MARK = f"{Colors.GREEN}✓"
+FAIL_MARK = f"{Colors.FAIL}✗"
+
+MAIN_MENU = '\n'.join([
+    f"{MENU_NUMBERS[1]} 📋 List all hosts",
+    f"{MENU_NUMBERS[2]} 🔗 Connect to host (SSH)",
+    f"{MENU_NUMBERS[3]} 📁 File transfer (SFTP)",
+    f"{MENU_NUMBERS[4]} ➕ Add new host",
+    f"{MENU_NUMBERS[5]} ✏️  Edit host",
+    f"{MENU_NUMBERS[6]} 🗑️  Delete host",
+    f"{MENU_NUMBERS[7]} 🚪 Exit"
+]) + '\n'
+
+SFTP_MENU = '\n'.join([
+    f"{MENU_NUMBERS[1]} 📁 File Browser (Interactive)",
+    f"{MENU_NUMBERS[2]} 📋 Terminal SFTP Session",
+    f"{MENU_NUMBERS[3]} 🔄 Directory Sync (rsync)",
+    f"{MENU_NUMBERS[4]} ⬅️  Back to main menu"
+]) + '\n'
+
+FILE_ACTIONS_MENU = '\n'.join([
+    f"\n{MENU_NUMBERS[1]} 📥 Download file",
+    f"{MENU_NUMBERS[2]} 👁️  View file info",
+    f"{MENU_NUMBERS[3]} 📝 View file content (small files)",
+    f"{MENU_NUMBERS[4]} ⬅️  Back to browser"
+]) + '\n'
+
+# Download destinations after "current directory", which varies
+DESTINATION_CHOICES = '\n'.join([
+    f"{MENU_NUMBERS[2]} Desktop",
+    f"{MENU_NUMBERS[3]} Downloads folder",
+    f"{MENU_NUMBERS[4]} Custom path"
+]) + '\n'
+
+# MIME prefixes of payloads that are already compressed
+COMPRESSED_TYPES = ('image/', 'video/', 'audio/', 'application/zip', 'application/x-7z',
+                    'application/x-rar', 'application/x-xz', 'application/gzip', 'application/pdf')
+
+# Concurrent transfer batches per host, kept under OpenSSH's default MaxSessions (10)
+MAX_PARALLEL_TRANSFERS = 8
+
+# Seconds a remote directory listing is reused before it is fetched again
+LISTING_TTL = 30
+
+# Last seen listings, kept across runs so revisited directories show instantly
+LISTING_CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'ssh-fm' / 'listings.json'
+LISTING_CACHE_SIZE = 200
+
+# SSH config keyword (lowercase) -> (host field, value converter)
+CONFIG_OPTIONS = {
+    'hostname': ('hostname', str),
+    'port': ('port', str),
+    'user': ('user', str),
+    'identityfile': ('identity_file', lambda value: HOME + value[1:] if value == '~' or value.startswith('~/') else value),
+    'passwordauthentication': ('password_auth', lambda value: value.lower() == 'yes'),
+}
+
+# File selections like '1,3-7,9'
+SELECTION_FORMAT = re.compile(r'\s*\d+\s*(-\s*\d+\s*)?(,\s*\d+\s*(-\s*\d+\s*)?)*')
+RANGE_RE = re.compile(r'(\d+)(?:\s*-\s*(\d+))?')
+
+# Characters sftp treats specially inside a double-quoted path
+SFTP_SPECIAL_RE = re.compile(r'[\\"*?\[\]]')
+
+def parse_selection(text, count):
+    """Parse a selection like '1,3-7,9' into sorted unique numbers within 1..count"""
+    if not SELECTION_FORMAT.fullmatch(text):
+        raise ValueError(f"Invalid selection: {text}")
+    
+    # Ranges are clamped to 1..count before expanding, so '1-1000000000' stays cheap
+    numbers = itertools.chain.from_iterable(
+        range(max(1, int(start)), min(count, int(end or start)) + 1)
+        for start, end in RANGE_RE.findall(text)
+    )
+    # Flag each chosen number, reading the flags back gives them sorted and unique
+    flags = bytearray(count + 1)
+    for number in numbers:
+        flags[number] = 1
+    return [number for number, flag in enumerate(flags) if flag]
+
+def sftp_quote(path):
+    """Quote a path for an sftp command line, glob characters included since
+    sftp expands the paths given to put, get and ls"""
+    return '"' + SFTP_SPECIAL_RE.sub(r'\\\g<0>', path) + '"'
+
 class SSHManager:
     def __init__(self):
         self.ssh_config_path = Path.home() / '.ssh' / 'config'
         self.hosts = {}
+        self._config_mtime = None
+        self._dirty = False
+        self._host_names = None
+        self._hosts_listing = None
+        
+        # Shared OpenSSH master connections, one control socket per host. The
+        # directory lives under /tmp because macOS's long $TMPDIR plus the %C
+        # hash would exceed the 104 byte socket path limit
+        self._cm_dir = Path(tempfile.mkdtemp(prefix='ssh-fm-', dir='/tmp'))
+        self._ssh_opts = [
+            '-o', f'ControlPath={self._cm_dir}/%C',
+            '-o', 'ControlMaster=auto',
+            '-o', 'ControlPersist=600'
+        ]
+        self._masters = set()
+        self._master_lock = threading.Lock()
+        self._connecting = {}
+        self._prefetch_failed = set()
+        self._last_host = None
+        self._last_download_dest = None
+        self._sftp_sessions = {}
+        self._sftp_lock = threading.Lock()
+        self._ls_cache = {}
+        self._refreshing = set()
+        self._browsing = None
+        self.load_listing_cache()
+        self._rsync_version = None
+        atexit.register(self.close_connections)
+        atexit.register(self.flush_config)
+        atexit.register(self.save_listing_cache)
+        
+        # Plain readline when driven from a pipe, input() only for a terminal
+        self._read = input if sys.stdin.isatty() else self.read_line
+        
+        # Menu choice -> handler
+        self._menu_dispatch = {
+            '1': self.show_hosts,
+            '2': self.connect_to_host,
+            '3': self.sftp_menu,
+            '4': self.add_host,
+            '5': self.edit_host,
+            '6': self.delete_host
+        }
+        self._sftp_dispatch = {
+            '1': self.browse_remote,
+            '2': self.interactive_sftp,
+            '3': self.sync_directory
+        }
+        
         self.load_config()
     
     def load_config(self):
@@ -33,9 +182,13 @@ class SSHManager:
             return
         
         with open(self.ssh_config_path, 'r') as f:
+            self._config_mtime = os.fstat(f.fileno()).st_mtime
             content = f.read()
         
         # Parse SSH config
+        self.hosts = {}
+        self._host_names = None
+        self._hosts_listing = None
         current_host = None
         for line in content.split('\n'):
             line = line.strip()
@@ -59,18 +212,39 @@ class SSHManager:
                 parts = line.split(None, 1)
                 if len(parts) == 2:
                     key, value = parts
-                    key_lower = key.lower()
-                    
-                    if key_lower == 'hostname':
-                        self.hosts[current_host]['hostname'] = value
-                    elif key_lower == 'port':
-                        self.hosts[current_host]['port'] = value
-                    elif key_lower == 'user':
-                        self.hosts[current_host]['user'] = value
-                    elif key_lower == 'identityfile':
-                        self.hosts[current_host]['identity_file'] = value.replace('~', str(Path.home()))
-                    elif key_lower == 'passwordauthentication':
-                        self.hosts[current_host]['password_auth'] = value.lower() == 'yes'
+                    option = CONFIG_OPTIONS.get(key.lower())
+                    if option:
+                        field, convert = option
+                        self.hosts[current_host][field] = convert(value)
+    
+    def reload_if_changed(self):
+        """Re-parse the SSH config only if it was modified outside ssh-fm"""
+        if self._dirty:
+            return
+        try:
+            mtime = os.stat(self.ssh_config_path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._config_mtime:
+            self.load_config()
+    
+    def mark_dirty(self):
+        """Flag in-memory hosts as changed, written out by flush_config"""
+        self._dirty = True
+        self._host_names = None
+        self._hosts_listing = None
+    
+    def host_names(self):
+        """Host names in menu order, rebuilt only after the hosts change"""
+        if self._host_names is None:
+            self._host_names = tuple(self.hosts)
+        return self._host_names
+    
+    def flush_config(self):
+        """Save pending host changes, if any"""
+        if self._dirty:
+            self.save_config()
+            self._dirty = False
     
     def save_config(self):
         """Save hosts back to SSH config file"""
@@ -85,7 +259,9 @@ class SSHManager:
             if config['user']:
                 config_lines.append(f"  User {config['user']}")
             if config['identity_file']:
-                identity_file = config['identity_file'].replace(str(Path.home()), '~')
+                identity_file = config['identity_file']
+                if identity_file.startswith(HOME + os.sep):
+                    identity_file = '~' + identity_file[len(HOME):]
                 config_lines.append(f"  IdentityFile {identity_file}")
             config_lines.append("  IdentitiesOnly yes")
             if config['password_auth']:
@@ -102,13 +278,308 @@ class SSHManager:
             "  ServerAliveCountMax 3"
         ])
         
-        with open(self.ssh_config_path, 'w') as f:
+        # Write to a sibling temp file and swap it in, so a crash never leaves
+        # a half-written config (follow symlinks so dotfile links survive)
+        target = os.path.realpath(self.ssh_config_path)
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(target),
+                                         prefix='.config-', delete=False) as f:
             f.write('\n'.join(config_lines))
+        os.replace(f.name, target)
+        self._config_mtime = os.stat(target).st_mtime
+    
+    def ensure_master(self, host_name, quiet=False):
+        """Open the master connection for a host so later ssh/scp/sftp calls reuse it,
+        quiet opens it without prompting or printing anything"""
+        # Only the bookkeeping is locked; a second caller waits for the attempt
+        # in flight instead of racing it to the control socket
+        with self._master_lock:
+            if host_name in self._masters:
+                return
+            pending = self._connecting.get(host_name)
+            if pending is None:
+                self._connecting[host_name] = threading.Event()
+        
+        if pending is not None:
+            if quiet:
+                return
+            if not pending.is_set():
+                print(f"{Colors.CYAN}Waiting for the connection to {host_name}...{Colors.ENDC}")
+            pending.wait()
+            return self.ensure_master(host_name)
+        
+        connected = False
+        try:
+            # -M ignores ControlMaster=auto, so a master left by an interactive
+            # login has to be looked for first or a second connection is made
+            if self.master_running(host_name):
+                connected = True
+            elif quiet:
+                result = subprocess.run(['ssh', '-MNf', '-o', 'BatchMode=yes', '-o', 'ConnectTimeout=5']
+                                        + self._ssh_opts + [host_name],
+                                        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                connected = result.returncode == 0
+            else:
+                result = subprocess.run(['ssh', '-MNf'] + self._ssh_opts + [host_name])
+                connected = result.returncode == 0
+        finally:
+            with self._master_lock:
+                if connected:
+                    self._masters.add(host_name)
+                self._connecting.pop(host_name).set()
+    
+    def master_running(self, host_name):
+        """Whether a master connection is already listening on the host's control socket"""
+        result = subprocess.run(['ssh', '-O', 'check'] + self._ssh_opts + [host_name], capture_output=True)
+        return result.returncode == 0
+    
+    def master_alive(self, host_name):
+        """Check a known master still answers before background sftp use,
+        forgetting it if not; one that outlived ControlPersist would make
+        sftp log in by itself"""
+        if self.master_running(host_name):
+            return True
+        self._masters.discard(host_name)
+        return False
+    
+    def prefetch(self, host_name):
+        """Warm the connection and home listing of a host while the user reads a menu"""
+        if host_name in self._connecting:
+            return
+        if host_name not in self._masters:
+            # A batch-mode login can't succeed for these and every failed try
+            # is logged by the server
+            if self.hosts[host_name]['password_auth'] or host_name in self._prefetch_failed:
+                return
+        else:
+            cached = self._ls_cache.get((host_name, '~'))
+            if cached and cached[0] is not None and time.monotonic() - cached[0] < LISTING_TTL:
+                return
+        threading.Thread(target=self.warm_host, args=(host_name,), daemon=True).start()
+    
+    def warm_host(self, host_name):
+        """Open the master connection and list the home directory ahead of use"""
+        # A master opened or found by ensure_master was just checked
+        known = host_name in self._masters
+        # Hosts that need a password or key passphrase are left to the foreground
+        self.ensure_master(host_name, quiet=True)
+        if host_name not in self._masters:
+            if host_name not in self._connecting:
+                self._prefetch_failed.add(host_name)
+            return
+        if known and not self.master_alive(host_name):
+            return
+        dirs, files, error = self.list_remote_dir(host_name, '~')
+        if not error:
+            self._ls_cache[(host_name, '~')] = (time.monotonic(), dirs, files)
+    
+    def run_remote(self, host_name, command, **kwargs):
+        """Run a shell command on the host over its master connection"""
+        self.ensure_master(host_name)
+        return subprocess.run(['ssh'] + self._ssh_opts + [host_name, command], **kwargs)
+    
+    def close_connections(self):
+        """Stop all master connections and remove their control sockets"""
+        # Let a background listing finish reading its reply before the
+        # sessions are told to quit, so both don't read the same pipe
+        locked = self._sftp_lock.acquire(timeout=5)
+        for session in self._sftp_sessions.values():
+            if not locked:
+                # A listing is still stuck on the session
+                session.kill()
+                continue
+            try:
+                session.communicate('bye\n', timeout=5)
+            except Exception:
+                session.kill()
+        self._sftp_sessions.clear()
+        if locked:
+            self._sftp_lock.release()
+        
+        if self._cm_dir.exists():
+            for socket_path in self._cm_dir.iterdir():
+                subprocess.run(['ssh', '-o', f'ControlPath={socket_path}', '-O', 'exit', 'ssh-fm'],
+                               capture_output=True)
+        self._masters.clear()
+        shutil.rmtree(self._cm_dir, ignore_errors=True)
+    
+    def rsync_options(self, sample_names):
+        """rsync flags for this rsync build; compress only if the sample looks compressible"""
+        if self._rsync_version is None:
+            try:
+                result = subprocess.run(['rsync', '--version'], capture_output=True, text=True)
+                match = re.search(r'version v?(\d+)\.(\d+)', result.stdout)
+                self._rsync_version = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+            except OSError:
+                self._rsync_version = (0, 0)
+        
+        options = ['-av']
+        options.append('--info=progress2' if self._rsync_version >= (3, 1) else '--progress')
+        
+        # Recompressing media/archives only burns CPU; rsync >= 3.2 negotiates
+        # zstd for -z on its own when both ends support it
+        compressed = 0
+        for name in sample_names:
+            mime_type, encoding = mimetypes.guess_type(name)
+            if encoding or (mime_type and mime_type.startswith(COMPRESSED_TYPES)):
+                compressed += 1
+        if compressed * 2 <= len(sample_names):
+            options.append('-z')
+        return options
+    
+    def sftp_session(self, host_name):
+        """Long-lived sftp process for a host, driven in batch mode over stdin"""
+        session = self._sftp_sessions.get(host_name)
+        if session is None or session.poll() is not None:
+            session = subprocess.Popen(['sftp', '-o', 'BatchMode=no'] + self._ssh_opts + ['-b', '-', host_name],
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, text=True, bufsize=1)
+            self._sftp_sessions[host_name] = session
+        return session
+    
+    def list_remote_dir(self, host_name, path):
+        """List a remote directory, returns (dirs, files, error)"""
+        # The session starts in the remote home directory and never changes it,
+        # so '~' and home-relative paths need no cd
+        if path.startswith('~/'):
+            path = path[2:]
+        target = ''
+        if path not in ('~', ''):
+            target = ' ' + sftp_quote(path)
+        
+        # Listings may also be refreshed from a background thread
+        if not self._sftp_lock.acquire(blocking=False):
+            if threading.current_thread() is threading.main_thread():
+                print(f"{Colors.CYAN}Waiting for a background listing of {host_name}...{Colors.ENDC}")
+            self._sftp_lock.acquire()
+        try:
+            session = self.sftp_session(host_name)
+            try:
+                # '-' keeps the batch running on errors, the echo marks the end of the reply
+                session.stdin.write(f'-ls -la{target}\n!echo __END__\n')
+                session.stdin.flush()
+            except (BrokenPipeError, OSError):
+                return [], [], 'SFTP session closed'
+            
+            dirs = []
+            files = []
+            messages = []
+            for line in session.stdout:
+                line = line.rstrip('\n')
+                if line == '__END__':
+                    break
+                if not line.strip() or line.startswith('sftp>'):
+                    continue
+            
+                parts = line.split(None, 8)
+                if len(parts) == 9 and len(parts[0]) >= 10:
+                    perms, name = parts[0], parts[8]
+                    if perms.startswith('d'):
+                        if name not in ['.', '..']:
+                            dirs.append(name)
+                    else:
+                        files.append(name)
+                else:
+                    messages.append(line)
+            else:
+                # Reply never finished, the sftp process exited
+                return dirs, files, '\n'.join(messages) or 'SFTP session closed'
+            
+            if messages and not dirs and not files:
+                return dirs, files, '\n'.join(messages)
+            dirs.sort()
+            files.sort()
+            return dirs, files, None
+        finally:
+            self._sftp_lock.release()
+    
+    def remote_listing(self, host_name, path):
+        """list_remote_dir through a cache keyed by (host, path); stale entries
+        are returned at once and refreshed in the background"""
+        key = (host_name, path)
+        cached = self._ls_cache.get(key)
+        # Without a master the sftp session would log in on its own, which
+        # may prompt, so that is only done in the foreground
+        if cached and host_name in self._masters:
+            fetched, dirs, files = cached
+            # Entries loaded from disk have no fetch time and are always stale
+            if fetched is None or time.monotonic() - fetched >= LISTING_TTL:
+                self.refresh_listing_async(host_name, path)
+            return dirs, files, None
+        
+        dirs, files, error = self.list_remote_dir(host_name, path)
+        if not error:
+            self._ls_cache[key] = (time.monotonic(), dirs, files)
+        return dirs, files, error
+    
+    def refresh_listing_async(self, host_name, path):
+        """Re-fetch a cached listing in a background thread"""
+        key = (host_name, path)
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        threading.Thread(target=self.refresh_listing, args=(host_name, path), daemon=True).start()
+    
+    def refresh_listing(self, host_name, path):
+        """Update a cached listing and tell the user if it changed"""
+        key = (host_name, path)
+        try:
+            if not self.master_alive(host_name):
+                return
+            dirs, files, error = self.list_remote_dir(host_name, path)
+            cached = self._ls_cache.pop(key, None)
+            if error:
+                if self._browsing == key:
+                    print(f"\n{Colors.FAIL}Error refreshing {host_name}:{path}: {error}{Colors.ENDC}")
+                return
+            self._ls_cache[key] = (time.monotonic(), dirs, files)
+            if cached and (cached[1], cached[2]) != (dirs, files) and self._browsing == key:
+                print(f"\n{Colors.WARNING}🔄 Listing of {host_name}:{path} changed, press Enter to reload{Colors.ENDC}")
+        finally:
+            self._refreshing.discard(key)
+    
+    def load_listing_cache(self):
+        """Load listings saved by a previous run, marked stale"""
+        try:
+            with open(LISTING_CACHE_PATH, 'r') as f:
+                entries = json.load(f)
+            for entry in entries:
+                self._ls_cache[(entry['host'], entry['path'])] = (None, entry['dirs'], entry['files'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    
+    def save_listing_cache(self):
+        """Save the most recent listings for the next run"""
+        entries = [{'host': host_name, 'path': path, 'dirs': dirs, 'files': files}
+                   for (host_name, path), (_, dirs, files) in list(self._ls_cache.items())[-LISTING_CACHE_SIZE:]]
+        try:
+            LISTING_CACHE_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Temporary files are created 0600, the listings stay private to the user
+            with tempfile.NamedTemporaryFile('w', dir=LISTING_CACHE_PATH.parent,
+                                             prefix='.listings-', delete=False) as f:
+                json.dump(entries, f)
+            os.replace(f.name, LISTING_CACHE_PATH)
+        except OSError:
+            pass
+    
+    def invalidate_listing(self, host_name, path):
+        """Drop the cached listing of a remote directory after it changed"""
+        self._ls_cache.pop((host_name, path), None)
+    
+    def rsync_ssh_command(self):
+        """Remote shell command for rsync that goes through the shared connection"""
+        return ' '.join(['ssh'] + [shlex.quote(opt) for opt in self._ssh_opts])
+    
+    def read_line(self, prompt=''):
+        """input() for non-interactive stdin, without the readline round trip"""
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip('\n')
     
     def print_header(self):
-        print(f"\n{Colors.HEADER}{'='*60}")
-        print(f"🔑 SSH CONNECTION MANAGER")
-        print(f"{'='*60}{Colors.ENDC}\n")
+        sys.stdout.write(HEADER_BAR)
     
     def list_hosts(self):
         """List all configured hosts"""
@@ -116,26 +587,36 @@ class SSHManager:
             print(f"{Colors.WARNING}No SSH hosts configured.{Colors.ENDC}")
             return
         
-        print(f"{Colors.CYAN}Configured SSH Hosts:{Colors.ENDC}\n")
-        
-        for i, (host_name, config) in enumerate(self.hosts.items(), 1):
-            hostname = config['hostname'] or 'localhost'
-            port = config['port']
-            user = config['user'] or 'current user'
-            key_file = config['identity_file']
+        if self._hosts_listing is None:
+            lines = [f"{Colors.CYAN}Configured SSH Hosts:{Colors.ENDC}\n"]
             
-            print(f"{Colors.GREEN}{i}. {host_name}{Colors.ENDC}")
-            print(f"   📍 {hostname}:{port}")
-            print(f"   👤 {user}")
+            for i, (host_name, config) in enumerate(self.hosts.items(), 1):
+                hostname = config['hostname'] or 'localhost'
+                port = config['port']
+                user = config['user'] or 'current user'
+                key_file = config['identity_file']
+                
+                lines.append(f"{Colors.GREEN}{i}. {host_name}{Colors.ENDC}")
+                lines.append(f"   📍 {hostname}:{port}")
+                lines.append(f"   👤 {user}")
+                
+                if key_file:
+                    key_name = os.path.basename(key_file)
+                    lines.append(f"   🔑 {key_name}")
+                elif config['password_auth']:
+                    lines.append(f"   🔒 Password authentication")
+                else:
+                    lines.append(f"   🔑 Default key")
+                lines.append("")
             
-            if key_file:
-                key_name = os.path.basename(key_file)
-                print(f"   🔑 {key_name}")
-            elif config['password_auth']:
-                print(f"   🔒 Password authentication")
-            else:
-                print(f"   🔑 Default key")
-            print()
+            self._hosts_listing = '\n'.join(lines) + '\n'
+        
+        sys.stdout.write(self._hosts_listing)
+    
+    def show_hosts(self):
+        """List hosts and wait for the user"""
+        self.list_hosts()
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def connect_to_host(self):
         """Connect to a selected host"""
@@ -145,15 +626,16 @@ class SSHManager:
         
         self.list_hosts()
         try:
-            choice = input(f"{Colors.CYAN}Select host number to connect: {Colors.ENDC}")
+            choice = self._read(f"{Colors.CYAN}Select host number to connect: {Colors.ENDC}")
             if not choice.isdigit():
                 return
             
-            host_names = list(self.hosts.keys())
+            host_names = self.host_names()
             if 1 <= int(choice) <= len(host_names):
                 host_name = host_names[int(choice) - 1]
                 print(f"{Colors.GREEN}Connecting to {host_name}...{Colors.ENDC}")
-                subprocess.run(['ssh', host_name])
+                self._last_host = host_name
+                subprocess.run(['ssh'] + self._ssh_opts + [host_name])
             else:
                 print(f"{Colors.FAIL}Invalid selection.{Colors.ENDC}")
         except KeyboardInterrupt:
@@ -163,19 +645,19 @@ class SSHManager:
         """Add a new SSH host"""
         print(f"{Colors.CYAN}Add New SSH Host{Colors.ENDC}\n")
         
-        host_name = input("Host alias/name: ").strip()
+        host_name = self._read("Host alias/name: ").strip()
         if not host_name or host_name in self.hosts:
             print(f"{Colors.FAIL}Invalid or duplicate host name.{Colors.ENDC}")
             return
         
-        hostname = input("IP/Hostname: ").strip()
-        port = input("Port (default 22): ").strip() or "22"
-        user = input("Username: ").strip()
+        hostname = self._read("IP/Hostname: ").strip()
+        port = self._read("Port (default 22): ").strip() or "22"
+        user = self._read("Username: ").strip()
         
         print("\nAuthentication method:")
         print("1. SSH Key")
         print("2. Password")
-        auth_choice = input("Choose (1/2): ").strip()
+        auth_choice = self._read("Choose (1/2): ").strip()
         
         identity_file = ""
         password_auth = False
@@ -193,11 +675,11 @@ class SSHManager:
                 for i, key_file in enumerate(key_files, 1):
                     print(f"{i}. {key_file.name}")
                 
-                key_choice = input("Select key number (or press Enter for default): ").strip()
+                key_choice = self._read("Select key number (or press Enter for default): ").strip()
                 if key_choice.isdigit() and 1 <= int(key_choice) <= len(key_files):
                     identity_file = str(key_files[int(key_choice) - 1])
             else:
-                identity_file = input("Key file path (optional): ").strip()
+                identity_file = self._read("Key file path (optional): ").strip()
         
         elif auth_choice == "2":
             password_auth = True
@@ -210,7 +692,7 @@ class SSHManager:
             'password_auth': password_auth
         }
         
-        self.save_config()
+        self.mark_dirty()
         print(f"{Colors.GREEN}Host '{host_name}' added successfully!{Colors.ENDC}")
     
     def edit_host(self):
@@ -221,11 +703,11 @@ class SSHManager:
         
         self.list_hosts()
         try:
-            choice = input(f"{Colors.CYAN}Select host number to edit: {Colors.ENDC}")
+            choice = self._read(f"{Colors.CYAN}Select host number to edit: {Colors.ENDC}")
             if not choice.isdigit():
                 return
             
-            host_names = list(self.hosts.keys())
+            host_names = self.host_names()
             if 1 <= int(choice) <= len(host_names):
                 host_name = host_names[int(choice) - 1]
                 self.edit_host_details(host_name)
@@ -248,28 +730,28 @@ class SSHManager:
         print("6. Rename host")
         print("7. Back to main menu")
         
-        choice = input(f"\n{Colors.CYAN}What to edit (1-7): {Colors.ENDC}").strip()
+        choice = self._read(f"\n{Colors.CYAN}What to edit (1-7): {Colors.ENDC}").strip()
         
         if choice == "1":
-            new_hostname = input(f"New hostname ({config['hostname']}): ").strip()
+            new_hostname = self._read(f"New hostname ({config['hostname']}): ").strip()
             if new_hostname:
                 config['hostname'] = new_hostname
         elif choice == "2":
-            new_port = input(f"New port ({config['port']}): ").strip()
+            new_port = self._read(f"New port ({config['port']}): ").strip()
             if new_port:
                 config['port'] = new_port
         elif choice == "3":
-            new_user = input(f"New username ({config['user']}): ").strip()
+            new_user = self._read(f"New username ({config['user']}): ").strip()
             if new_user:
                 config['user'] = new_user
         elif choice == "4":
-            new_key = input(f"New identity file ({config['identity_file']}): ").strip()
+            new_key = self._read(f"New identity file ({config['identity_file']}): ").strip()
             config['identity_file'] = new_key
         elif choice == "5":
             config['password_auth'] = not config['password_auth']
             print(f"Password auth set to: {'Yes' if config['password_auth'] else 'No'}")
         elif choice == "6":
-            new_name = input(f"New host name ({host_name}): ").strip()
+            new_name = self._read(f"New host name ({host_name}): ").strip()
             if new_name and new_name != host_name and new_name not in self.hosts:
                 self.hosts[new_name] = self.hosts.pop(host_name)
                 host_name = new_name
@@ -277,7 +759,7 @@ class SSHManager:
             return
         
         if choice in ["1", "2", "3", "4", "5", "6"]:
-            self.save_config()
+            self.mark_dirty()
             print(f"{Colors.GREEN}Host updated successfully!{Colors.ENDC}")
     
     def delete_host(self):
@@ -288,17 +770,17 @@ class SSHManager:
         
         self.list_hosts()
         try:
-            choice = input(f"{Colors.CYAN}Select host number to delete: {Colors.ENDC}")
+            choice = self._read(f"{Colors.CYAN}Select host number to delete: {Colors.ENDC}")
             if not choice.isdigit():
                 return
             
-            host_names = list(self.hosts.keys())
+            host_names = self.host_names()
             if 1 <= int(choice) <= len(host_names):
                 host_name = host_names[int(choice) - 1]
-                confirm = input(f"{Colors.WARNING}Delete '{host_name}'? (y/N): {Colors.ENDC}").strip().lower()
+                confirm = self._read(f"{Colors.WARNING}Delete '{host_name}'? (y/N): {Colors.ENDC}").strip().lower()
                 if confirm == 'y':
                     del self.hosts[host_name]
-                    self.save_config()
+                    self.mark_dirty()
                     print(f"{Colors.GREEN}Host '{host_name}' deleted.{Colors.ENDC}")
             else:
                 print(f"{Colors.FAIL}Invalid selection.{Colors.ENDC}")
@@ -313,11 +795,11 @@ class SSHManager:
         
         self.list_hosts()
         try:
-            choice = input(f"{Colors.CYAN}Select host for SFTP: {Colors.ENDC}")
+            choice = self._read(f"{Colors.CYAN}Select host for SFTP: {Colors.ENDC}")
             if not choice.isdigit():
                 return
             
-            host_names = list(self.hosts.keys())
+            host_names = self.host_names()
             if 1 <= int(choice) <= len(host_names):
                 host_name = host_names[int(choice) - 1]
                 self.sftp_operations(host_name)
@@ -328,131 +810,115 @@ class SSHManager:
     
     def sftp_operations(self, host_name):
         """SFTP operations for selected host"""
+        self.ensure_master(host_name)
+        self._last_host = host_name
+        
         while True:
             print(f"\n{Colors.HEADER}SFTP Operations - {host_name}{Colors.ENDC}\n")
-            print(f"{Colors.BLUE}1.{Colors.ENDC} 📁 File Browser (Interactive)")
-            print(f"{Colors.BLUE}2.{Colors.ENDC} 📋 Terminal SFTP Session")
-            print(f"{Colors.BLUE}3.{Colors.ENDC} 🔄 Directory Sync (rsync)")
-            print(f"{Colors.BLUE}4.{Colors.ENDC} ⬅️  Back to main menu")
+            sys.stdout.write(SFTP_MENU)
             
             try:
-                sftp_choice = input(f"\n{Colors.CYAN}Select SFTP operation (1-4): {Colors.ENDC}").strip()
+                sftp_choice = self._read(f"\n{Colors.CYAN}Select SFTP operation (1-4): {Colors.ENDC}").strip()
                 
-                if sftp_choice == "1":
-                    self.browse_remote(host_name)
-                elif sftp_choice == "2":
-                    self.interactive_sftp(host_name)
-                elif sftp_choice == "3":
-                    self.sync_directory(host_name)
+                handler = self._sftp_dispatch.get(sftp_choice)
+                if handler:
+                    handler(host_name)
                 elif sftp_choice == "4":
                     break
                 else:
                     print(f"{Colors.FAIL}Invalid option. Please choose 1-4.{Colors.ENDC}")
                     
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 break
     
     def browse_remote(self, host_name, current_path="~"):
         """Interactive remote directory browser"""
-        while True:
-            print(f"\n{Colors.HEADER}📁 Remote File Browser - {host_name}:{current_path}{Colors.ENDC}")
-            
-            try:
-                # Get directory listing with file types
-                result = subprocess.run(['ssh', host_name, f'ls -la {current_path}'], 
-                                      capture_output=True, text=True)
-                if result.returncode != 0:
-                    print(f"{Colors.FAIL}Error: {result.stderr}{Colors.ENDC}")
-                    break
-                
-                lines = result.stdout.strip().split('\n')[1:]  # Skip 'total' line
-                files = []
-                dirs = []
-                
-                for line in lines:
-                    if line.strip():
-                        parts = line.split()
-                        if len(parts) >= 9:
-                            perms = parts[0]
-                            name = ' '.join(parts[8:])
-                            if perms.startswith('d'):
-                                if name not in ['.', '..']:
-                                    dirs.append(name)
-                            else:
-                                files.append(name)
-                
-                # Display directories first, then files
-                all_items = []
-                if current_path != '/' and current_path != '~':
-                    all_items.append(('..', 'dir'))  # Parent directory
-                
-                for d in sorted(dirs):
-                    all_items.append((d, 'dir'))
-                for f in sorted(files):
-                    all_items.append((f, 'file'))
+        try:
+            while True:
+                print(f"\n{Colors.HEADER}📁 Remote File Browser - {host_name}:{current_path}{Colors.ENDC}")
+                # Background refreshes only report on the directory being shown
+                self._browsing = (host_name, current_path)
                 
-                if not all_items:
-                    print(f"{Colors.WARNING}Directory is empty{Colors.ENDC}")
-                else:
-                    print(f"\n{Colors.CYAN}Contents:{Colors.ENDC}")
-                    for i, (item, item_type) in enumerate(all_items, 1):
-                        if item_type == 'dir':
+                try:
+                    # Get directory listing with file types
+                    dirs, files, error = self.remote_listing(host_name, current_path)
+                    if error:
+                        print(f"{Colors.FAIL}Error: {error}{Colors.ENDC}")
+                        break
+                    
+                    # Directories first, then files; item numbers index into
+                    # entries followed by files
+                    entries = dirs
+                    if current_path != '/' and current_path != '~':
+                        entries = ['..'] + dirs  # Parent directory
+                    item_count = len(entries) + len(files)
+                    
+                    if not item_count:
+                        print(f"{Colors.WARNING}Directory is empty{Colors.ENDC}")
+                    else:
+                        print(f"\n{Colors.CYAN}Contents:{Colors.ENDC}")
+                        for i, item in enumerate(entries, 1):
                             print(f"{Colors.BLUE}{i:2d}.{Colors.ENDC} 📁 {item}")
-                        else:
+                        for i, item in enumerate(files, len(entries) + 1):
                             print(f"{Colors.GREEN}{i:2d}.{Colors.ENDC} 📄 {item}")
-                
-                print(f"\n{Colors.CYAN}Options:{Colors.ENDC}")
-                print(f"{Colors.BLUE}[1-{len(all_items)}]{Colors.ENDC} Navigate to item")
-                print(f"{Colors.BLUE}d{Colors.ENDC} Download selected file")
-                print(f"{Colors.BLUE}dm{Colors.ENDC} Download multiple files")
-                print(f"{Colors.BLUE}u{Colors.ENDC} Upload file to current directory")
-                print(f"{Colors.BLUE}um{Colors.ENDC} Upload multiple files")
-                print(f"{Colors.BLUE}p{Colors.ENDC} Change path manually")
-                print(f"{Colors.BLUE}q{Colors.ENDC} Back to SFTP menu")
-                
-                choice = input(f"\n{Colors.CYAN}Your choice: {Colors.ENDC}").strip().lower()
-                
-                if choice == 'q':
-                    break
-                elif choice == 'p':
-                    new_path = input(f"{Colors.CYAN}Enter new path: {Colors.ENDC}").strip()
-                    if new_path:
-                        current_path = new_path
-                elif choice == 'u':
-                    self.upload_file_to_path(host_name, current_path)
-                elif choice == 'um':
-                    self.upload_multiple_files(host_name, current_path)
-                elif choice == 'd':
-                    if all_items:
-                        file_num = input(f"{Colors.CYAN}Enter file number to download: {Colors.ENDC}").strip()
-                        if file_num.isdigit() and 1 <= int(file_num) <= len(all_items):
-                            item_name, item_type = all_items[int(file_num) - 1]
-                            if item_type == 'file':
+                    
+                    print(f"\n{Colors.CYAN}Options:{Colors.ENDC}")
+                    print(f"{Colors.BLUE}[1-{item_count}]{Colors.ENDC} Navigate to item")
+                    print(f"{Colors.BLUE}d{Colors.ENDC} Download selected file")
+                    print(f"{Colors.BLUE}dm{Colors.ENDC} Download multiple files")
+                    print(f"{Colors.BLUE}u{Colors.ENDC} Upload file to current directory")
+                    print(f"{Colors.BLUE}um{Colors.ENDC} Upload multiple files")
+                    print(f"{Colors.BLUE}p{Colors.ENDC} Change path manually")
+                    print(f"{Colors.BLUE}r{Colors.ENDC} Refresh listing")
+                    print(f"{Colors.BLUE}q{Colors.ENDC} Back to SFTP menu")
+                    
+                    choice = self._read(f"\n{Colors.CYAN}Your choice: {Colors.ENDC}").strip().lower()
+                    
+                    if choice == 'q':
+                        break
+                    elif choice == 'p':
+                        new_path = self._read(f"{Colors.CYAN}Enter new path: {Colors.ENDC}").strip()
+                        if new_path:
+                            current_path = new_path
+                    elif choice == 'r':
+                        self.invalidate_listing(host_name, current_path)
+                    elif choice == 'u':
+                        self.upload_file_to_path(host_name, current_path)
+                    elif choice == 'um':
+                        self.upload_multiple_files(host_name, current_path)
+                    elif choice == 'd':
+                        if item_count:
+                            file_num = self._read(f"{Colors.CYAN}Enter file number to download: {Colors.ENDC}").strip()
+                            if file_num.isdigit() and len(entries) < int(file_num) <= item_count:
+                                item_name = files[int(file_num) - len(entries) - 1]
                                 file_path = f"{current_path.rstrip('/')}/{item_name}" if current_path != '~' else item_name
                                 self.download_specific_file(host_name, file_path, item_name)
-                elif choice == 'dm':
-                    if all_items:
-                        self.download_multiple_files(host_name, current_path, all_items)
-                elif choice.isdigit() and 1 <= int(choice) <= len(all_items):
-                    item_name, item_type = all_items[int(choice) - 1]
-                    if item_type == 'dir':
-                        if item_name == '..':
-                            # Go to parent directory
-                            if current_path != '~' and current_path != '/':
-                                current_path = '/'.join(current_path.rstrip('/').split('/')[:-1]) or '/'
-                        else:
-                            # Enter directory
-                            if current_path == '~':
-                                current_path = item_name
+                    elif choice == 'dm':
+                        if item_count:
+                            self.download_multiple_files(host_name, current_path, files, len(entries) + 1)
+                    elif choice.isdigit() and 1 <= int(choice) <= item_count:
+                        index = int(choice) - 1
+                        if index < len(entries):
+                            item_name = entries[index]
+                            if item_name == '..':
+                                # Go to parent directory
+                                if current_path != '~' and current_path != '/':
+                                    current_path = '/'.join(current_path.rstrip('/').split('/')[:-1]) or '/'
                             else:
-                                current_path = f"{current_path.rstrip('/')}/{item_name}"
-                    else:
-                        # Show file options
-                        self.file_actions(host_name, current_path, item_name)
-                        
-            except Exception as e:
-                print(f"{Colors.FAIL}Error browsing directory: {e}{Colors.ENDC}")
-                input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+                                # Enter directory
+                                if current_path == '~':
+                                    current_path = item_name
+                                else:
+                                    current_path = f"{current_path.rstrip('/')}/{item_name}"
+                        else:
+                            # Show file options
+                            self.file_actions(host_name, current_path, files[index - len(entries)])
+                            
+                except Exception as e:
+                    print(f"{Colors.FAIL}Error browsing directory: {e}{Colors.ENDC}")
+                    self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        finally:
+            self._browsing = None
     
     def upload_file(self, host_name):
         """Upload file to server"""
@@ -463,7 +929,7 @@ class SSHManager:
         result = subprocess.run(['ls', '-la'], capture_output=True, text=True)
         print(result.stdout[:500])  # Show first 500 chars
         
-        local_path = input(f"\n{Colors.CYAN}Local file path (drag file here or type path): {Colors.ENDC}").strip()
+        local_path = self._read(f"\n{Colors.CYAN}Local file path (drag file here or type path): {Colors.ENDC}").strip()
         if not local_path:
             return
         
@@ -474,7 +940,7 @@ class SSHManager:
             print(f"{Colors.FAIL}File not found: {local_path}{Colors.ENDC}")
             return
         
-        remote_path = input(f"{Colors.CYAN}Remote destination path: {Colors.ENDC}").strip()
+        remote_path = self._read(f"{Colors.CYAN}Remote destination path: {Colors.ENDC}").strip()
         if not remote_path:
             filename = os.path.basename(local_path)
             remote_path = f"~/{filename}"
@@ -482,7 +948,7 @@ class SSHManager:
         print(f"{Colors.GREEN}Uploading {local_path} to {remote_path}...{Colors.ENDC}")
         
         try:
-            result = subprocess.run(['scp', local_path, f'{host_name}:{remote_path}'])
+            result = subprocess.run(['scp'] + self._ssh_opts + [local_path, f'{host_name}:{remote_path}'])
             if result.returncode == 0:
                 print(f"{Colors.GREEN}✅ Upload successful!{Colors.ENDC}")
             else:
@@ -490,22 +956,22 @@ class SSHManager:
         except Exception as e:
             print(f"{Colors.FAIL}Error uploading file: {e}{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def download_file(self, host_name):
         """Download file from server"""
         print(f"{Colors.CYAN}Download File from {host_name}{Colors.ENDC}\n")
         
         # Browse remote first
-        browse = input(f"{Colors.CYAN}Browse remote directory first? (y/N): {Colors.ENDC}").strip().lower()
+        browse = self._read(f"{Colors.CYAN}Browse remote directory first? (y/N): {Colors.ENDC}").strip().lower()
         if browse == 'y':
             self.browse_remote(host_name)
         
-        remote_path = input(f"{Colors.CYAN}Remote file path: {Colors.ENDC}").strip()
+        remote_path = self._read(f"{Colors.CYAN}Remote file path: {Colors.ENDC}").strip()
         if not remote_path:
             return
         
-        local_path = input(f"{Colors.CYAN}Local destination (default: current dir): {Colors.ENDC}").strip()
+        local_path = self._read(f"{Colors.CYAN}Local destination (default: current dir): {Colors.ENDC}").strip()
         if not local_path:
             filename = os.path.basename(remote_path)
             local_path = f"./{filename}"
@@ -513,7 +979,7 @@ class SSHManager:
         print(f"{Colors.GREEN}Downloading {remote_path} to {local_path}...{Colors.ENDC}")
         
         try:
-            result = subprocess.run(['scp', f'{host_name}:{remote_path}', local_path])
+            result = subprocess.run(['scp'] + self._ssh_opts + [f'{host_name}:{remote_path}', local_path])
             if result.returncode == 0:
                 print(f"{Colors.GREEN}✅ Download successful!{Colors.ENDC}")
                 print(f"File saved to: {os.path.abspath(local_path)}")
@@ -522,7 +988,7 @@ class SSHManager:
         except Exception as e:
             print(f"{Colors.FAIL}Error downloading file: {e}{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def interactive_sftp(self, host_name):
         """Open interactive SFTP session"""
@@ -530,7 +996,7 @@ class SSHManager:
         print(f"{Colors.CYAN}Use 'help' for commands, 'exit' or 'quit' to close{Colors.ENDC}")
         
         try:
-            subprocess.run(['sftp', host_name])
+            subprocess.run(['sftp'] + self._ssh_opts + [host_name])
         except Exception as e:
             print(f"{Colors.FAIL}Error opening SFTP session: {e}{Colors.ENDC}")
     
@@ -540,16 +1006,22 @@ class SSHManager:
         print("1. Upload local directory to remote")
         print("2. Download remote directory to local")
         
-        sync_choice = input(f"\n{Colors.CYAN}Choose sync direction (1/2): {Colors.ENDC}").strip()
+        sync_choice = self._read(f"\n{Colors.CYAN}Choose sync direction (1/2): {Colors.ENDC}").strip()
         
         if sync_choice == "1":
-            local_dir = input(f"{Colors.CYAN}Local directory path: {Colors.ENDC}").strip()
-            remote_dir = input(f"{Colors.CYAN}Remote directory path: {Colors.ENDC}").strip()
+            local_dir = self._read(f"{Colors.CYAN}Local directory path: {Colors.ENDC}").strip()
+            remote_dir = self._read(f"{Colors.CYAN}Remote directory path: {Colors.ENDC}").strip()
             
             if local_dir and remote_dir:
                 print(f"{Colors.GREEN}Syncing {local_dir} to {host_name}:{remote_dir}...{Colors.ENDC}")
                 try:
-                    result = subprocess.run(['rsync', '-avz', '--progress', local_dir, f'{host_name}:{remote_dir}'])
+                    if os.path.isdir(local_dir):
+                        sample = [entry.name for entry in itertools.islice(os.scandir(local_dir), 100)]
+                    else:
+                        sample = [local_dir]
+                    result = subprocess.run(['rsync'] + self.rsync_options(sample) + ['-e', self.rsync_ssh_command(),
+                                             local_dir, f'{host_name}:{remote_dir}'])
+                    self.invalidate_listing(host_name, remote_dir)
                     if result.returncode == 0:
                         print(f"{Colors.GREEN}✅ Sync successful!{Colors.ENDC}")
                     else:
@@ -558,13 +1030,17 @@ class SSHManager:
                     print(f"{Colors.FAIL}Error syncing directory: {e}{Colors.ENDC}")
                     
         elif sync_choice == "2":
-            remote_dir = input(f"{Colors.CYAN}Remote directory path: {Colors.ENDC}").strip()
-            local_dir = input(f"{Colors.CYAN}Local directory path: {Colors.ENDC}").strip()
+            remote_dir = self._read(f"{Colors.CYAN}Remote directory path: {Colors.ENDC}").strip()
+            local_dir = self._read(f"{Colors.CYAN}Local directory path: {Colors.ENDC}").strip()
             
             if local_dir and remote_dir:
                 print(f"{Colors.GREEN}Syncing {host_name}:{remote_dir} to {local_dir}...{Colors.ENDC}")
                 try:
-                    result = subprocess.run(['rsync', '-avz', '--progress', f'{host_name}:{remote_dir}', local_dir])
+                    # Sample the remote side through the already open sftp session
+                    dirs, files, error = self.remote_listing(host_name, remote_dir)
+                    sample = files[:100] if not error else [remote_dir]
+                    result = subprocess.run(['rsync'] + self.rsync_options(sample) + ['-e', self.rsync_ssh_command(),
+                                             f'{host_name}:{remote_dir}', local_dir])
                     if result.returncode == 0:
                         print(f"{Colors.GREEN}✅ Sync successful!{Colors.ENDC}")
                     else:
@@ -572,7 +1048,7 @@ class SSHManager:
                 except Exception as e:
                     print(f"{Colors.FAIL}Error syncing directory: {e}{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def upload_file_to_path(self, host_name, remote_path):
         """Upload file to specific remote path"""
@@ -580,16 +1056,9 @@ class SSHManager:
         
         # Show local files for easy selection
         print(f"\n{Colors.CYAN}Local files in current directory:{Colors.ENDC}")
+        local_files = []
         try:
-            result = subprocess.run(['ls', '-la'], capture_output=True, text=True)
-            local_files = []
-            for line in result.stdout.split('\n')[1:]:
-                if line.strip() and not line.startswith('d'):
-                    parts = line.split()
-                    if len(parts) >= 9 and not parts[0].startswith('d'):
-                        filename = ' '.join(parts[8:])
-                        if filename not in ['.', '..']:
-                            local_files.append(filename)
+            local_files = sorted(entry.name for entry in os.scandir('.') if entry.is_file())
             
             if local_files:
                 for i, file in enumerate(local_files[:10], 1):  # Show max 10 files
@@ -604,11 +1073,11 @@ class SSHManager:
         print(f"{Colors.BLUE}f{Colors.ENDC} Enter file path manually")
         print(f"{Colors.BLUE}d{Colors.ENDC} Drag \u0026 drop file (paste path)")
         
-        choice = input(f"\n{Colors.CYAN}Your choice: {Colors.ENDC}").strip().lower()
+        choice = self._read(f"\n{Colors.CYAN}Your choice: {Colors.ENDC}").strip().lower()
         
         local_file = None
         if choice == 'f' or choice == 'd':
-            local_path = input(f"{Colors.CYAN}File path (drag here or type): {Colors.ENDC}").strip()
+            local_path = self._read(f"{Colors.CYAN}File path (drag here or type): {Colors.ENDC}").strip()
             local_file = local_path.strip('"').strip("'")
         elif choice.isdigit() and 1 <= int(choice) <= min(len(local_files), 10):
             local_file = local_files[int(choice) - 1]
@@ -620,7 +1089,8 @@ class SSHManager:
             print(f"{Colors.GREEN}Uploading {local_file} to {full_remote_path}...{Colors.ENDC}")
             
             try:
-                result = subprocess.run(['scp', local_file, f'{host_name}:{full_remote_path}'])
+                result = subprocess.run(['scp'] + self._ssh_opts + [local_file, f'{host_name}:{full_remote_path}'])
+                self.invalidate_listing(host_name, remote_path)
                 if result.returncode == 0:
                     print(f"{Colors.GREEN}✅ Upload successful!{Colors.ENDC}")
                 else:
@@ -630,29 +1100,29 @@ class SSHManager:
         else:
             print(f"{Colors.FAIL}File not found or invalid selection.{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def download_specific_file(self, host_name, remote_file_path, filename):
         """Download specific file with local path options"""
         print(f"\n{Colors.CYAN}📥 Download {filename}{Colors.ENDC}")
         
         # Show download options
-        print(f"\n{Colors.CYAN}Download options:{Colors.ENDC}")
-        print(f"{Colors.BLUE}1.{Colors.ENDC} Current directory ({os.getcwd()})")
-        print(f"{Colors.BLUE}2.{Colors.ENDC} Desktop")
-        print(f"{Colors.BLUE}3.{Colors.ENDC} Downloads folder")
-        print(f"{Colors.BLUE}4.{Colors.ENDC} Custom path")
+        sys.stdout.write('\n'.join([
+            f"\n{Colors.CYAN}Download options:{Colors.ENDC}",
+            f"{MENU_NUMBERS[1]} Current directory ({os.getcwd()})",
+            DESTINATION_CHOICES
+        ]))
         
-        choice = input(f"\n{Colors.CYAN}Where to save? (1-4): {Colors.ENDC}").strip()
+        choice = self._read(f"\n{Colors.CYAN}Where to save? (1-4): {Colors.ENDC}").strip()
         
         if choice == '1':
             local_path = f"./{filename}"
         elif choice == '2':
-            local_path = f"{Path.home()}/Desktop/{filename}"
+            local_path = f"{HOME}/Desktop/{filename}"
         elif choice == '3':
-            local_path = f"{Path.home()}/Downloads/{filename}"
+            local_path = f"{HOME}/Downloads/{filename}"
         elif choice == '4':
-            local_path = input(f"{Colors.CYAN}Enter full path: {Colors.ENDC}").strip()
+            local_path = self._read(f"{Colors.CYAN}Enter full path: {Colors.ENDC}").strip()
             if not local_path:
                 local_path = f"./{filename}"
         else:
@@ -661,7 +1131,7 @@ class SSHManager:
         print(f"{Colors.GREEN}Downloading {remote_file_path} to {local_path}...{Colors.ENDC}")
         
         try:
-            result = subprocess.run(['scp', f'{host_name}:{remote_file_path}', local_path])
+            result = subprocess.run(['scp'] + self._ssh_opts + [f'{host_name}:{remote_file_path}', local_path])
             if result.returncode == 0:
                 print(f"{Colors.GREEN}✅ Download successful!{Colors.ENDC}")
                 print(f"{Colors.CYAN}File saved to: {os.path.abspath(local_path)}{Colors.ENDC}")
@@ -670,20 +1140,15 @@ class SSHManager:
         except Exception as e:
             print(f"{Colors.FAIL}Error: {e}{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def file_actions(self, host_name, current_path, filename):
         """Show actions available for a selected file"""
-        print(f"\n{Colors.CYAN}📄 File Actions: {filename}{Colors.ENDC}")
-        
         file_path = f"{current_path.rstrip('/')}/{filename}" if current_path != '~' else filename
         
-        print(f"\n{Colors.BLUE}1.{Colors.ENDC} 📥 Download file")
-        print(f"{Colors.BLUE}2.{Colors.ENDC} 👁️  View file info")
-        print(f"{Colors.BLUE}3.{Colors.ENDC} 📝 View file content (small files)")
-        print(f"{Colors.BLUE}4.{Colors.ENDC} ⬅️  Back to browser")
+        sys.stdout.write(f"\n{Colors.CYAN}📄 File Actions: {filename}{Colors.ENDC}\n" + FILE_ACTIONS_MENU)
         
-        choice = input(f"\n{Colors.CYAN}Select action (1-4): {Colors.ENDC}").strip()
+        choice = self._read(f"\n{Colors.CYAN}Select action (1-4): {Colors.ENDC}").strip()
         
         if choice == '1':
             self.download_specific_file(host_name, file_path, filename)
@@ -698,51 +1163,53 @@ class SSHManager:
         print(f"\n{Colors.CYAN}📊 File Info: {os.path.basename(file_path)}{Colors.ENDC}")
         
         try:
-            # Get file info
-            result = subprocess.run(['ssh', host_name, f'ls -lh \"{file_path}\"'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"\n{result.stdout}")
-            
-            # Get file type
-            result = subprocess.run(['ssh', host_name, f'file \"{file_path}\"'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"Type: {result.stdout.strip()}")
+            # Get file info and file type in one round trip
+            quoted = shlex.quote(file_path)
+            result = self.run_remote(host_name, f'ls -lh {quoted}; printf "\\n---SEP---\\n"; file {quoted}',
+                                     capture_output=True, text=True)
+            ls_out, _, file_out = result.stdout.partition('---SEP---')
+            if ls_out.strip():
+                print(f"\n{ls_out.strip()}\n")
+            if file_out.strip():
+                print(f"Type: {file_out.strip()}")
                 
         except Exception as e:
             print(f"{Colors.FAIL}Error getting file info: {e}{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def view_file_content(self, host_name, file_path):
         """View content of small text files"""
         print(f"\n{Colors.CYAN}📖 File Content: {os.path.basename(file_path)}{Colors.ENDC}")
         
         try:
-            # Check file size first
-            result = subprocess.run(['ssh', host_name, f'stat -f%z \"{file_path}\" 2>/dev/null || stat -c%s \"{file_path}\"'], 
-                                  capture_output=True, text=True)
-            
-            file_size = int(result.stdout.strip()) if result.stdout.strip().isdigit() else 0
+            # Size check and read in one round trip: the remote side prints a
+            # marker instead of the content when the file is over 10KB
+            command = (f'f={shlex.quote(file_path)}; sz=$(stat -c%s "$f" 2>/dev/null || stat -f%z "$f" 2>/dev/null); '
+                       'if [ -n "$sz" ] && [ "$sz" -gt 10000 ]; then echo __TOOBIG__:$sz; else head -50 "$f"; fi')
+            # Raw bytes: the size needs no decoding and binary content can't fail it
+            result = self.run_remote(host_name, command, capture_output=True)
             
-            if file_size > 10000:  # 10KB limit
+            if result.stdout.startswith(b'__TOOBIG__:'):
+                try:
+                    file_size = int(result.stdout[11:].strip())
+                except ValueError:
+                    file_size = 0
                 print(f"{Colors.WARNING}File is too large ({file_size} bytes). Use download instead.{Colors.ENDC}")
+            elif result.returncode == 0:
+                sys.stdout.write('\n'.join([
+                    f"\n{Colors.GREEN}Content (first 50 lines):{Colors.ENDC}",
+                    "-" * 50,
+                    result.stdout.decode(errors='replace'),
+                    "-" * 50
+                ]) + '\n')
             else:
-                result = subprocess.run(['ssh', host_name, f'head -50 \"{file_path}\"'], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    print(f"\n{Colors.GREEN}Content (first 50 lines):{Colors.ENDC}")
-                    print("-" * 50)
-                    print(result.stdout)
-                    print("-" * 50)
-                else:
-                    print(f"{Colors.FAIL}Could not read file content.{Colors.ENDC}")
+                print(f"{Colors.FAIL}Could not read file content.{Colors.ENDC}")
                     
         except Exception as e:
             print(f"{Colors.FAIL}Error viewing file: {e}{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
     def upload_multiple_files(self, host_name, remote_path):
         """Upload multiple files to remote directory"""
@@ -751,15 +1218,7 @@ class SSHManager:
         # Show local files
         print(f"\n{Colors.CYAN}Local files in current directory:{Colors.ENDC}")
         try:
-            result = subprocess.run(['ls', '-la'], capture_output=True, text=True)
-            local_files = []
-            for line in result.stdout.split('\n')[1:]:
-                if line.strip() and not line.startswith('d'):
-                    parts = line.split()
-                    if len(parts) >= 9 and not parts[0].startswith('d'):
-                        filename = ' '.join(parts[8:])
-                        if filename not in ['.', '..']:
-                            local_files.append(filename)
+            local_files = sorted(entry.name for entry in os.scandir('.') if entry.is_file())
             
             if local_files:
                 for i, file in enumerate(local_files, 1):
@@ -775,24 +1234,12 @@ class SSHManager:
         print(f"\n{Colors.CYAN}Select files to upload:{Colors.ENDC}")
         print(f"{Colors.BLUE}Example:{Colors.ENDC} '1,3,5' or '1-5' or '1,3-7,9'")
         
-        selection = input(f"{Colors.CYAN}File numbers: {Colors.ENDC}").strip()
+        selection = self._read(f"{Colors.CYAN}File numbers: {Colors.ENDC}").strip()
         if not selection:
             return
         
-        # Parse selection
-        selected_files = []
         try:
-            for part in selection.split(','):
-                part = part.strip()
-                if '-' in part:
-                    start, end = map(int, part.split('-'))
-                    selected_files.extend(range(start, end + 1))
-                else:
-                    selected_files.append(int(part))
-            
-            # Remove duplicates and validate
-            selected_files = list(set(selected_files))
-            selected_files = [i for i in selected_files if 1 <= i <= len(local_files)]
+            selected_files = parse_selection(selection, len(local_files))
             
             if not selected_files:
                 print(f"{Colors.FAIL}No valid files selected.{Colors.ENDC}")
@@ -802,40 +1249,37 @@ class SSHManager:
             upload_files = [local_files[i-1] for i in selected_files]
             print(f"\n{Colors.GREEN}Uploading {len(upload_files)} files...{Colors.ENDC}")
             
+            remote_dir = f"{remote_path.rstrip('/')}/" if remote_path != '~' else ''
             success_count = 0
-            for file in upload_files:
-                filename = os.path.basename(file)
-                full_remote_path = f"{remote_path.rstrip('/')}/{filename}" if remote_path != '~' else filename
-                
-                print(f"{Colors.CYAN}Uploading {file}...{Colors.ENDC}")
-                try:
-                    result = subprocess.run(['scp', file, f'{host_name}:{full_remote_path}'], 
-                                          capture_output=True, text=True)
-                    if result.returncode == 0:
-                        print(f"{Colors.GREEN}✓ {file} uploaded{Colors.ENDC}")
-                        success_count += 1
-                    else:
-                        print(f"{Colors.FAIL}✗ {file} failed: {result.stderr.strip()}{Colors.ENDC}")
-                except Exception as e:
-                    print(f"{Colors.FAIL}✗ {file} error: {e}{Colors.ENDC}")
+            try:
+                for files, failed in self.run_transfers(self.sftp_upload, host_name, upload_files, remote_dir):
+                    for file in files:
+                        if file in failed:
+                            print(f"{FAIL_MARK} {file} failed{Colors.ENDC}")
+                        else:
+                            print(f"{OK_MARK} {file} uploaded{Colors.ENDC}")
+                            success_count += 1
+            except Exception as e:
+                print(f"{FAIL_MARK} Upload error: {e}{Colors.ENDC}")
+            self.invalidate_listing(host_name, remote_path)
             
             print(f"\n{Colors.GREEN}✅ Upload completed: {success_count}/{len(upload_files)} files successful{Colors.ENDC}")
             
         except ValueError:
             print(f"{Colors.FAIL}Invalid selection format. Use numbers, ranges, or comma-separated.{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
     
-    def download_multiple_files(self, host_name, current_path, all_items):
-        """Download multiple files from remote directory"""
+    def download_multiple_files(self, host_name, current_path, files, first_num=1):
+        """Download multiple files from remote directory, numbered from first_num"""
         print(f"\n{Colors.CYAN}📥 Download Multiple Files from {host_name}:{current_path}{Colors.ENDC}")
         
         # Filter only files
-        files_only = [(i+1, item_name) for i, (item_name, item_type) in enumerate(all_items) if item_type == 'file']
+        files_only = list(enumerate(files, first_num))
         
         if not files_only:
             print(f"{Colors.WARNING}No files available for download in current directory{Colors.ENDC}")
-            input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+            self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
             return
         
         print(f"\n{Colors.CYAN}Available files:{Colors.ENDC}")
@@ -845,44 +1289,43 @@ class SSHManager:
         print(f"\n{Colors.CYAN}Select files to download:{Colors.ENDC}")
         print(f"{Colors.BLUE}Example:{Colors.ENDC} '1,3,5' or '1-5' or '1,3-7,9'")
         
-        selection = input(f"{Colors.CYAN}File numbers: {Colors.ENDC}").strip()
+        selection = self._read(f"{Colors.CYAN}File numbers: {Colors.ENDC}").strip()
         if not selection:
             return
         
-        # Choose download destination
-        print(f"\n{Colors.CYAN}Download destination:{Colors.ENDC}")
-        print(f"{Colors.BLUE}1.{Colors.ENDC} Current directory ({os.getcwd()})")
-        print(f"{Colors.BLUE}2.{Colors.ENDC} Desktop")
-        print(f"{Colors.BLUE}3.{Colors.ENDC} Downloads folder")
-        print(f"{Colors.BLUE}4.{Colors.ENDC} Custom path")
-        
-        dest_choice = input(f"\n{Colors.CYAN}Where to save? (1-4): {Colors.ENDC}").strip()
-        
-        if dest_choice == '2':
-            base_path = str(Path.home() / 'Desktop')
-        elif dest_choice == '3':
-            base_path = str(Path.home() / 'Downloads')
-        elif dest_choice == '4':
-            base_path = input(f"{Colors.CYAN}Enter directory path: {Colors.ENDC}").strip()
-            if not base_path:
-                base_path = os.getcwd()
-        else:
-            base_path = os.getcwd()
+        # Choose download destination, offering the last one used first
+        base_path = None
+        if self._last_download_dest:
+            reuse = self._read(f"\n{Colors.CYAN}Save to {self._last_download_dest}? [Y/n]: {Colors.ENDC}").strip().lower()
+            if reuse not in ('n', 'no'):
+                base_path = self._last_download_dest
+        
+        if base_path is None:
+            cwd = os.getcwd()
+            sys.stdout.write('\n'.join([
+                f"\n{Colors.CYAN}Download destination:{Colors.ENDC}",
+                f"{MENU_NUMBERS[1]} Current directory ({cwd})",
+                DESTINATION_CHOICES
+            ]))
+            
+            dest_choice = self._read(f"\n{Colors.CYAN}Where to save? (1-4): {Colors.ENDC}").strip()
+            
+            if dest_choice == '2':
+                base_path = os.path.join(HOME, 'Desktop')
+            elif dest_choice == '3':
+                base_path = os.path.join(HOME, 'Downloads')
+            elif dest_choice == '4':
+                base_path = self._read(f"{Colors.CYAN}Enter directory path: {Colors.ENDC}").strip()
+                if not base_path:
+                    base_path = cwd
+            else:
+                base_path = cwd
+        self._last_download_dest = base_path
         
-        # Parse selection
         try:
-            selected_nums = []
-            for part in selection.split(','):
-                part = part.strip()
-                if '-' in part:
-                    start, end = map(int, part.split('-'))
-                    selected_nums.extend(range(start, end + 1))
-                else:
-                    selected_nums.append(int(part))
-            
-            # Remove duplicates and validate
-            selected_nums = list(set(selected_nums))
-            valid_files = [(num, filename) for num, filename in files_only if num in selected_nums]
+            # Numbers below first_num belong to directories and are skipped
+            selected_nums = parse_selection(selection, first_num + len(files) - 1)
+            valid_files = [(num, files[num - first_num]) for num in selected_nums if num >= first_num]
             
             if not valid_files:
                 print(f"{Colors.FAIL}No valid files selected.{Colors.ENDC}")
@@ -891,22 +1334,19 @@ class SSHManager:
             # Download files
             print(f"\n{Colors.GREEN}Downloading {len(valid_files)} files to {base_path}...{Colors.ENDC}")
             
+            filenames = [filename for file_num, filename in valid_files]
+            remote_dir = f"{current_path.rstrip('/')}/" if current_path != '~' else ''
             success_count = 0
-            for file_num, filename in valid_files:
-                remote_file_path = f"{current_path.rstrip('/')}/{filename}" if current_path != '~' else filename
-                local_file_path = os.path.join(base_path, filename)
-                
-                print(f"{Colors.CYAN}Downloading {filename}...{Colors.ENDC}")
-                try:
-                    result = subprocess.run(['scp', f'{host_name}:{remote_file_path}', local_file_path], 
-                                          capture_output=True, text=True)
-                    if result.returncode == 0:
-                        print(f"{Colors.GREEN}✓ {filename} downloaded{Colors.ENDC}")
-                        success_count += 1
-                    else:
-                        print(f"{Colors.FAIL}✗ {filename} failed: {result.stderr.strip()}{Colors.ENDC}")
-                except Exception as e:
-                    print(f"{Colors.FAIL}✗ {filename} error: {e}{Colors.ENDC}")
+            try:
+                for batch, failed in self.run_transfers(self.sftp_download, host_name, filenames, remote_dir, base_path):
+                    for filename in batch:
+                        if filename in failed:
+                            print(f"{FAIL_MARK} {filename} failed{Colors.ENDC}")
+                        else:
+                            print(f"{OK_MARK} {filename} downloaded{Colors.ENDC}")
+                            success_count += 1
+            except Exception as e:
+                print(f"{FAIL_MARK} Download error: {e}{Colors.ENDC}")
             
             print(f"\n{Colors.GREEN}✅ Download completed: {success_count}/{len(valid_files)} files successful{Colors.ENDC}")
             print(f"{Colors.CYAN}Files saved to: {base_path}{Colors.ENDC}")
@@ -914,43 +1354,120 @@ class SSHManager:
         except ValueError:
             print(f"{Colors.FAIL}Invalid selection format. Use numbers, ranges, or comma-separated.{Colors.ENDC}")
         
-        input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+        self._read(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
+    
+    async def run_sftp_batch(self, host_name, files, commands):
+        """Run one sftp batch with a command per file, echoing errors as they
+        arrive, returns (files, failed)"""
+        proc = await asyncio.create_subprocess_exec('sftp', '-o', 'BatchMode=no', *self._ssh_opts,
+                                                    '-b', '-', host_name,
+                                                    stdin=asyncio.subprocess.PIPE,
+                                                    stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.STDOUT)
+        
+        async def feed():
+            # '-' keeps the batch going when one file fails
+            proc.stdin.write(''.join(f'-{command}\n' for command in commands).encode())
+            await proc.stdin.drain()
+            proc.stdin.close()
+        
+        # sftp echoes each command as 'sftp> ...' before running it, so any
+        # other line belongs to the file of the last echoed command
+        failed = set()
+        current = -1
+        feeder = asyncio.ensure_future(feed())
+        try:
+            async for raw_line in proc.stdout:
+                line = raw_line.decode(errors='replace').strip()
+                if not line:
+                    continue
+                if line.startswith('sftp>'):
+                    current += 1
+                    continue
+                print(f"{Colors.WARNING}  {line}{Colors.ENDC}")
+                if 0 <= current < len(files):
+                    failed.add(files[current])
+            await feeder
+            await proc.wait()
+        except asyncio.CancelledError:
+            # Interrupted batch: don't leave sftp running in the background
+            feeder.cancel()
+            proc.terminate()
+            await proc.wait()
+            raise
+        
+        # Commands sftp never reached (e.g. the connection dropped) failed too
+        failed.update(files[current + 1:])
+        return files, failed
+    
+    def sftp_upload(self, host_name, files, remote_dir):
+        """Upload local files into remote_dir with one sftp batch"""
+        commands = [f'put {sftp_quote(file)} {sftp_quote(remote_dir + os.path.basename(file))}'
+                    for file in files]
+        return self.run_sftp_batch(host_name, files, commands)
+    
+    def sftp_download(self, host_name, filenames, remote_dir, local_dir):
+        """Download files from remote_dir into local_dir with one sftp batch"""
+        commands = [f'get {sftp_quote(remote_dir + filename)} {sftp_quote(os.path.join(local_dir, filename))}'
+                    for filename in filenames]
+        return self.run_sftp_batch(host_name, filenames, commands)
+    
+    def run_transfers(self, transfer, host_name, items, *args):
+        """Split items into batches run concurrently over the shared connection,
+        yielding each batch result as it finishes"""
+        # Open the master first so the parallel batches don't each race to become it
+        self.ensure_master(host_name)
+        workers = min(MAX_PARALLEL_TRANSFERS, len(items))
+        if host_name not in self._masters:
+            # Every sftp would log in by itself and prompt on the same terminal
+            print(f"{Colors.WARNING}No shared connection to {host_name}, transferring in one batch{Colors.ENDC}")
+            workers = 1
+        batches = [items[i::workers] for i in range(workers)]
+        
+        # The sftp processes run side by side on one event loop, no threads needed
+        loop = asyncio.new_event_loop()
+        try:
+            pending = {loop.create_task(transfer(host_name, batch, *args)) for batch in batches}
+            while pending:
+                done, pending = loop.run_until_complete(
+                    asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.wait(pending))
+            loop.close()
     
     def show_menu(self):
         """Show main menu"""
         while True:
+            self.reload_if_changed()
             self.print_header()
-            print(f"{Colors.BLUE}1.{Colors.ENDC} 📋 List all hosts")
-            print(f"{Colors.BLUE}2.{Colors.ENDC} 🔗 Connect to host (SSH)")
-            print(f"{Colors.BLUE}3.{Colors.ENDC} 📁 File transfer (SFTP)")
-            print(f"{Colors.BLUE}4.{Colors.ENDC} ➕ Add new host")
-            print(f"{Colors.BLUE}5.{Colors.ENDC} ✏️  Edit host")
-            print(f"{Colors.BLUE}6.{Colors.ENDC} 🗑️  Delete host")
-            print(f"{Colors.BLUE}7.{Colors.ENDC} 🚪 Exit")
+            sys.stdout.write(MAIN_MENU)
+            
+            # The last used host is likely to be picked again
+            if self._last_host in self.hosts:
+                self.prefetch(self._last_host)
             
             try:
-                choice = input(f"\n{Colors.CYAN}Select option (1-7): {Colors.ENDC}").strip()
+                choice = self._read(f"\n{Colors.CYAN}Select option (1-7): {Colors.ENDC}").strip()
                 
-                if choice == "1":
-                    self.list_hosts()
-                    input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.ENDC}")
-                elif choice == "2":
-                    self.connect_to_host()
-                elif choice == "3":
-                    self.sftp_menu()
-                elif choice == "4":
-                    self.add_host()
-                elif choice == "5":
-                    self.edit_host()
-                elif choice == "6":
-                    self.delete_host()
+                handler = self._menu_dispatch.get(choice)
+                if handler:
+                    handler()
                 elif choice == "7":
                     print(f"{Colors.GREEN}Goodbye! 👋{Colors.ENDC}")
                     break
                 else:
                     print(f"{Colors.FAIL}Invalid option. Please choose 1-7.{Colors.ENDC}")
+                
+                # Hosts are written once per menu action, before anything
+                # else can run ssh against the config
+                self.flush_config()
                     
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print(f"\n{Colors.GREEN}Goodbye! 👋{Colors.ENDC}")
                 break
             except Exception as e: